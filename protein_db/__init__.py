@@ -1,7 +1,9 @@
 """Core classes and utilities for the Protein-DB package."""
 
-from .protein import Protein, describe
+from .protein import Protein, describe, embed, embed_many
+from .embed_cache import EmbeddingCache
 from .database import ProteinDB, ProteinModel, ProteinSimpleModel, read_fasta
+from .ingest import ingest_fasta
 from .query import ProteinQuery
 from .blast import protein_blast, deep_blast
 from .visualize import plot_embeddings
@@ -10,10 +12,14 @@ from .generate import generate_sequences
 __all__ = [
     "Protein",
     "describe",
+    "embed",
+    "embed_many",
+    "EmbeddingCache",
     "ProteinDB",
     "ProteinModel",
     "ProteinSimpleModel",
     "read_fasta",
+    "ingest_fasta",
     "ProteinQuery",
     "protein_blast",
     "deep_blast",
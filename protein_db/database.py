@@ -2,19 +2,111 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence, Tuple
+import hashlib
+import json
+import os
+import pickletools
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 import faiss
 import numpy as np
-from Bio import SeqIO
-from sqlalchemy import Column, Integer, String, create_engine
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from sqlalchemy import (
+    Column,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    select,
+    type_coerce,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.types import PickleType
+from sqlalchemy.types import TypeDecorator
 
-from .protein import Protein, describe
+from .ingest import PIPELINE_MIN_BYTES, ingest_fasta
+from .protein import Protein, describe, embed_many, latent_dim
 
 Base = declarative_base()
 
+# Simple-mode databases with at least this many rows are searched with a
+# trained IVF-PQ index instead of an exact flat L2 index.
+IVF_THRESHOLD = 50_000
+IVF_NPROBE = 16
+# Embedding rows hashed into the fingerprint stored next to a saved index.
+FINGERPRINT_ROWS = 16
+# Graph degree and search breadth of indexes from ``build_ann_index``.
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+# Indexes are moved to a GPU, when FAISS has one, once N * D exceeds this.
+GPU_MIN_ELEMENTS = 1_000_000
+# Storage precision of the exact index; selected with ``PROTEINDB_QUANT``.
+# bf16 keeps top-10 recall above 0.99 of fp32 on 256-d embeddings; 8bit
+# falls just short of that (roughly 0.98) in exchange for half the memory.
+QUANTIZERS = {
+    "fp32": None,
+    "bf16": faiss.ScalarQuantizer.QT_bf16,
+    "8bit": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+LEGACY_EMBEDDINGS = (
+    "Embeddings in this database were stored as pickles by an older version "
+    "of Protein-DB; re-create it from the source FASTA file"
+)
+
+
+def _is_pickle(value: bytes) -> bool:
+    """Whether ``value`` is a complete pickle (protocol 2 or later).
+
+    The opcode stream is only parsed with :mod:`pickletools`, never loaded.
+    """
+
+    if value[:1] != b"\x80" or value[-1:] != b".":
+        return False
+    try:
+        *_ops, (opcode, _arg, pos) = pickletools.genops(value)
+    except Exception:
+        return False
+    return opcode.name == "STOP" and pos == len(value) - 1
+
+
+def _check_embedding(value: bytes) -> None:
+    """Reject blobs that are not raw ``float32`` vectors.
+
+    Databases written before :class:`EmbeddingType` hold pickled arrays
+    (full mode) or pickled lists of floats (simple mode).
+    """
+
+    if len(value) % 4 or _is_pickle(value):
+        raise ValueError(LEGACY_EMBEDDINGS)
+
+
+class EmbeddingType(TypeDecorator):
+    """Store a 1D ``float32`` vector as raw bytes in a ``LargeBinary`` column.
+
+    Values are written with ``ndarray.tobytes`` and read back with
+    ``np.frombuffer``, avoiding pickle on every insert and select.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return np.ascontiguousarray(value, dtype=np.float32).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        _check_embedding(value)
+        return np.frombuffer(value, dtype=np.float32)
+
 
 class ProteinModel(Base):
     """SQLAlchemy model representing a full protein record."""
@@ -27,7 +119,35 @@ class ProteinModel(Base):
     locus = Column(String)
     organism = Column(String, index=True)
     sequence = Column(String)
-    embedding = Column(PickleType)
+    embedding = Column(EmbeddingType)
+
+
+# SQLite FTS5 index over ``proteins.description`` using the trigram tokenizer,
+# which serves substring ``LIKE`` queries from the index. It is declared on
+# its own metadata because it is created with raw DDL, not ``create_all``.
+proteins_fts = Table(
+    "proteins_fts",
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("description", String),
+)
+
+_FTS_DDL = (
+    "CREATE VIRTUAL TABLE proteins_fts USING fts5("
+    "description, content='proteins', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER proteins_fts_ai AFTER INSERT ON proteins BEGIN "
+    "INSERT INTO proteins_fts(rowid, description) "
+    "VALUES (new.id, new.description); END",
+    "CREATE TRIGGER proteins_fts_ad AFTER DELETE ON proteins BEGIN "
+    "INSERT INTO proteins_fts(proteins_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); END",
+    "CREATE TRIGGER proteins_fts_au AFTER UPDATE ON proteins BEGIN "
+    "INSERT INTO proteins_fts(proteins_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO proteins_fts(rowid, description) "
+    "VALUES (new.id, new.description); END",
+    "INSERT INTO proteins_fts(proteins_fts) VALUES ('rebuild')",
+)
 
 
 class ProteinSimpleModel(Base):
@@ -37,7 +157,7 @@ class ProteinSimpleModel(Base):
 
     id = Column(Integer, primary_key=True)
     sequence = Column(String, unique=True)
-    embedding = Column(PickleType)
+    embedding = Column(EmbeddingType)
 
 
 def read_fasta(filename: str, simple: bool = False):
@@ -49,22 +169,34 @@ def read_fasta(filename: str, simple: bool = False):
         Path to the FASTA file.
     simple:
         When ``True`` return only sequences, otherwise return ``Protein``
-        objects.
+        objects with embeddings computed in batches.
     """
 
-    if simple:
-        return [str(record.seq) for record in SeqIO.parse(filename, "fasta")]
-
-    data = []
-    for record in SeqIO.parse(filename, "fasta"):
-        accession, description, locus, organism = describe(record.description)
-        data.append(Protein(accession, description, locus, organism, str(record.seq)))
+    # SimpleFastaParser yields plain (title, sequence) strings and skips
+    # building SeqRecord/Seq objects that are never used here.
+    with open(filename) as handle:
+        if simple:
+            return [seq for _title, seq in SimpleFastaParser(handle)]
+        data = [
+            Protein(*describe(title), seq) for title, seq in SimpleFastaParser(handle)
+        ]
+
+    # The database stores these vectors itself; keep them out of the
+    # embedding cache so bulk loads are not written to disk twice.
+    embeddings = embed_many([p.sequence for p in data], use_cache=False)
+    for protein, z in zip(data, embeddings):
+        protein.attach_embedding(z)
     return data
 
 
 class ProteinDB:
     """High level helper around a SQLAlchemy session.
 
+    The table is mirrored in memory as a struct of arrays: ``sequences``
+    (and, in full mode, ``ids`` and ``accessions``) are parallel lists and
+    all embeddings live in one contiguous ``(N, D)`` ``float32`` matrix, so
+    similarity searches are single matrix operations.
+
     Parameters
     ----------
     url:
@@ -72,41 +204,254 @@ class ProteinDB:
         ``sqlite:///proteins_simple.db`` depending on ``simple``.
     simple:
         Store only sequence and embedding and enable FAISS based search.
+    index_path:
+        File used to persist a trained FAISS index between runs. Defaults to
+        ``<database file>.faiss`` for SQLite files and to no persistence
+        otherwise.
+    quantization:
+        ``fp32``, ``bf16`` or ``8bit`` storage for the exact search index.
+        Defaults to the ``PROTEINDB_QUANT`` environment variable or ``fp32``.
+        ``bf16`` keeps top-k recall above 0.99; ``8bit`` is slightly below
+        that (roughly 0.98 recall@10), so use it only when memory matters
+        more than exact neighbours.
     """
 
-    def __init__(self, url: str | None = None, simple: bool = False) -> None:
+    def __init__(
+        self,
+        url: str | None = None,
+        simple: bool = False,
+        index_path: str | None = None,
+        quantization: str | None = None,
+    ) -> None:
         self.simple = simple
+        if quantization is None:
+            quantization = os.environ.get("PROTEINDB_QUANT", "fp32")
+        if quantization not in QUANTIZERS:
+            raise ValueError(f"quantization must be one of {sorted(QUANTIZERS)}")
+        self.quantization = quantization
         if url is None:
             url = "sqlite:///proteins_simple.db" if simple else "sqlite:///proteins.db"
-        self.engine = create_engine(url)
+        if index_path is None:
+            parsed = make_url(url)
+            if parsed.get_backend_name() == "sqlite" and parsed.database:
+                if parsed.database != ":memory:":
+                    index_path = parsed.database + ".faiss"
+        self.index_path = index_path
+        # Large pages let executemany INSERTs go out as few multi-VALUES
+        # statements; dialects cap this by their bound-parameter limit.
+        self.engine = create_engine(url, insertmanyvalues_page_size=10_000)
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
-
-        if self.simple:
-            self.sequences: List[str] = []
-            self._embeddings: np.ndarray | None = None
-            self._index: faiss.Index | None = None
-            self._load_cache()
+        self.fts = self._create_fts()
+        # Inserts go through Core; sessions serve reads and explicit ORM work,
+        # so skip autoflush and keep loaded rows usable after commit.
+        self.Session = sessionmaker(
+            bind=self.engine, autoflush=False, expire_on_commit=False
+        )
+        # Statements are built once and reused for every insert.
+        self._insert_simple = insert(ProteinSimpleModel)
+        self._insert_full = insert(ProteinModel)
+        self._insert_full_returning = None
+        if self.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+            self._insert_full_returning = self._insert_full.returning(
+                ProteinModel.id, sort_by_parameter_order=True
+            )
+
+        self.sequences: List[str] = []
+        self.ids: List[int] = []
+        self.accessions: List[str] = []
+        # Row position by accession (full mode) or sequence (simple mode).
+        self._positions: Dict[str, int] = {}
+        self._embeddings: np.ndarray | None = None
+        # Backing storage for ``_embeddings``; grown geometrically so
+        # appends are amortized O(1) per row.
+        self._buffer: np.ndarray | None = None
+        # Squared row norms of ``_embeddings``, computed on first exact search
+        # and kept in a buffer with the same capacity as ``_buffer``.
+        self._norms2: np.ndarray | None = None
+        self._norms_buffer: np.ndarray | None = None
+        self._index: faiss.Index | None = None
+        # Optional approximate index over ``_embeddings``, see build_ann_index.
+        self.ann: faiss.Index | None = None
+        self._gpu_resources = None
+        self._load_cache()
 
     # ------------------------------------------------------------------
     # Loading helpers
     # ------------------------------------------------------------------
+    def _create_fts(self) -> bool:
+        """Create the description full-text index if SQLite supports it."""
+
+        if self.engine.dialect.name != "sqlite":
+            return False
+        with self.engine.connect() as conn:
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'proteins_fts'"
+            ).first()
+        if exists:
+            return True
+        try:
+            with self.engine.begin() as conn:
+                for statement in _FTS_DDL:
+                    conn.exec_driver_sql(statement)
+        except OperationalError:
+            # SQLite built without FTS5 or older than 3.34 (no trigram).
+            return False
+        return True
+
     def _load_cache(self) -> None:
         """Load all sequences and embeddings from the database."""
 
-        if not self.simple:
-            return
+        model = ProteinSimpleModel if self.simple else ProteinModel
+        # Embeddings are selected as raw bytes (bypassing EmbeddingType) so
+        # they can be copied straight into one contiguous matrix.
+        raw = type_coerce(model.embedding, LargeBinary).label("embedding")
+        if self.simple:
+            columns = [model.sequence, raw]
+        else:
+            columns = [model.id, model.accession, model.sequence, raw]
 
         with self.Session() as session:
-            rows = session.query(ProteinSimpleModel).all()
+            rows = session.execute(select(*columns).order_by(model.id)).all()
             self.sequences = [r.sequence for r in rows]
+            if not self.simple:
+                self.ids = [r.id for r in rows]
+                self.accessions = [r.accession for r in rows]
             if rows:
-                self._embeddings = np.vstack(
-                    [np.asarray(r.embedding, dtype=np.float32) for r in rows]
+                _check_embedding(rows[0].embedding)
+                dim = len(rows[0].embedding) // 4
+                blob = b"".join([r.embedding for r in rows])
+                if len(blob) != len(rows) * dim * 4:
+                    raise ValueError("Stored embeddings have inconsistent sizes")
+                # Full-mode rows are always embedded by the VAE; simple mode
+                # stores caller-supplied vectors of any width.
+                if not self.simple and dim != latent_dim:
+                    raise ValueError(
+                        f"Stored embeddings have {dim} dimensions but the model "
+                        f"produces {latent_dim}"
+                    )
+                # Zero-copy, read-only view; appends move it into a new buffer.
+                self._embeddings = np.frombuffer(blob, dtype=np.float32).reshape(
+                    len(rows), dim
                 )
             else:
                 self._embeddings = None
+        keys = self.sequences if self.simple else self.accessions
+        self._positions = {key: i for i, key in enumerate(keys)}
+        self._buffer = self._embeddings
+        self._norms2 = None
+        self._norms_buffer = None
         self._index = None
+        self.ann = None
+
+    def _append(
+        self,
+        sequences: List[str],
+        vectors: np.ndarray,
+        ids: List[int] | None = None,
+        accessions: List[str] | None = None,
+    ) -> None:
+        """Append freshly inserted rows to the in-memory cache and index."""
+
+        n = 0 if self._embeddings is None else len(self._embeddings)
+        if n and vectors.shape[1] != self._embeddings.shape[1]:
+            raise ValueError("Embedding dimension does not match the database")
+        end = n + len(vectors)
+        if self._buffer is None or end > len(self._buffer):
+            capacity = max(end, 2 * n)
+            buffer = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            if n:
+                buffer[:n] = self._embeddings
+            self._buffer = buffer
+            if self._norms2 is not None:
+                norms = np.empty(capacity, dtype=np.float32)
+                norms[:n] = self._norms2
+                self._norms_buffer = norms
+        self._buffer[n:end] = vectors
+        self._embeddings = self._buffer[:end]
+        self.sequences.extend(sequences)
+        if not self.simple:
+            self.ids.extend(ids)
+            self.accessions.extend(accessions)
+        keys = sequences if self.simple else accessions
+        self._positions.update((key, n + i) for i, key in enumerate(keys))
+        if self._norms2 is not None:
+            added = self._buffer[n:end]
+            self._norms_buffer[n:end] = np.einsum("ij,ij->i", added, added)
+            self._norms2 = self._norms_buffer[:end]
+        if self._index is not None:
+            self._index.add(vectors)
+        if self.ann is not None:
+            self.ann.add(vectors)
+
+    def _check_dim(self, vectors: np.ndarray) -> None:
+        """Reject ``vectors`` whose width differs from the stored embeddings.
+
+        Called before anything is written: a row of the wrong width would
+        make every later load of the table fail. Full-mode rows must also
+        match the VAE latent dimension.
+        """
+
+        if self._embeddings is not None:
+            dim = self._embeddings.shape[1]
+        elif not self.simple:
+            dim = latent_dim
+        else:
+            dim = vectors.shape[-1]
+        if vectors.shape[-1] != dim:
+            raise ValueError("Embedding dimension does not match the database")
+
+    def _insert_proteins(self, conn, rows: List[dict]) -> List[int] | None:
+        """Insert ``rows`` into ``proteins`` and return their ids in order.
+
+        Dialects that support ``INSERT ... RETURNING`` for executemany hand
+        the ids back in the same round trip. Elsewhere the ids after the last
+        cached one are read back; ``None`` means another writer interleaved
+        rows and the caller should reload the cache instead.
+        """
+
+        if self._insert_full_returning is not None:
+            return list(conn.execute(self._insert_full_returning, rows).scalars())
+
+        conn.execute(self._insert_full, rows)
+        last = self.ids[-1] if self.ids else 0
+        ids = list(
+            conn.execute(
+                select(ProteinModel.id)
+                .where(ProteinModel.id > last)
+                .order_by(ProteinModel.id)
+            ).scalars()
+        )
+        return ids if len(ids) == len(rows) else None
+
+    # ------------------------------------------------------------------
+    # In-memory view
+    # ------------------------------------------------------------------
+    @property
+    def embeddings(self) -> np.ndarray | None:
+        """The ``(N, D)`` embedding matrix in row order, ``None`` if empty."""
+
+        return self._embeddings
+
+    def __len__(self) -> int:
+        return len(self.sequences)
+
+    def __contains__(self, key: str) -> bool:
+        """Membership by accession (full mode) or sequence (simple mode)."""
+
+        return key in self._positions
+
+    def __getitem__(self, idx: int) -> Protein:
+        """Return row ``idx`` as a ``Protein`` sharing the cached embedding."""
+
+        sequence = self.sequences[idx]
+        z = self._embeddings[idx]
+        if self.simple:
+            return Protein("", "", "", "", sequence, z)
+        with self.Session() as session:
+            row = session.get(ProteinModel, self.ids[idx])
+            return Protein(
+                row.accession, row.description, row.locus, row.organism, sequence, z
+            )
 
     # ------------------------------------------------------------------
     # Insertion helpers
@@ -120,24 +465,28 @@ class ProteinDB:
             vec = np.asarray(embedding, dtype=np.float32)
             if vec.ndim != 1:
                 raise ValueError("Embedding must be a 1D vector")
-            with self.Session() as session:
-                session.add(ProteinSimpleModel(sequence=item, embedding=vec.tolist()))
-                session.commit()
-            self._load_cache()
+            self._check_dim(vec)
+            with self.engine.begin() as conn:
+                conn.execute(self._insert_simple, [{"sequence": item, "embedding": vec}])
+            self._append([item], vec[None, :])
         else:
             protein: Protein = item
-            with self.Session() as session:
-                session.add(
-                    ProteinModel(
-                        accession=protein.accession,
-                        description=protein.description,
-                        locus=protein.locus,
-                        organism=protein.organism,
-                        sequence=str(protein.sequence),
-                        embedding=protein.Z,
-                    )
-                )
-                session.commit()
+            vec = np.asarray(protein.Z, dtype=np.float32)
+            self._check_dim(vec)
+            row = {
+                "accession": protein.accession,
+                "description": protein.description,
+                "locus": protein.locus,
+                "organism": protein.organism,
+                "sequence": str(protein.sequence),
+                "embedding": vec,
+            }
+            with self.engine.begin() as conn:
+                ids = self._insert_proteins(conn, [row])
+            if ids is None:
+                self._load_cache()
+                return
+            self._append([row["sequence"]], vec[None, :], ids, [protein.accession])
 
     def add_many(self, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
         """Insert many sequences and embeddings at once (simple mode only)."""
@@ -145,23 +494,37 @@ class ProteinDB:
         if not self.simple:
             raise RuntimeError("add_many is only available in simple mode")
 
-        models = []
+        rows = []
         for seq, emb in items:
             vec = np.asarray(emb, dtype=np.float32)
             if vec.ndim != 1:
                 raise ValueError("Embedding must be a 1D vector")
-            models.append(ProteinSimpleModel(sequence=seq, embedding=vec.tolist()))
-
-        with self.Session() as session:
-            session.add_all(models)
-            session.commit()
+            rows.append({"sequence": seq, "embedding": vec})
 
-        self._load_cache()
+        if not rows:
+            return
+        if len({r["embedding"].shape[0] for r in rows}) > 1:
+            raise ValueError("Embeddings have inconsistent dimensions")
+        vectors = np.stack([r["embedding"] for r in rows])
+        self._check_dim(vectors)
+        with self.engine.begin() as conn:
+            conn.execute(self._insert_simple, rows)
+        self._append([r["sequence"] for r in rows], vectors)
 
     def add_from_fasta(
-        self, fasta_path: str, embeddings: Iterable[Sequence[float]] | None = None
+        self,
+        fasta_path: str,
+        embeddings: Iterable[Sequence[float]] | None = None,
+        workers: int | None = None,
     ) -> None:
-        """Read from a FASTA file and insert records into the database."""
+        """Read from a FASTA file and insert records into the database.
+
+        In full mode files of at least ``PIPELINE_MIN_BYTES`` are parsed by
+        ``workers`` processes while embedding and inserting overlap, see
+        :func:`protein_db.ingest.ingest_fasta`. Where processes are spawned
+        rather than forked (Windows), call it under an
+        ``if __name__ == "__main__":`` guard.
+        """
 
         if self.simple:
             if embeddings is None:
@@ -173,31 +536,61 @@ class ProteinDB:
                     "Number of embeddings must match number of sequences"
                 )
             self.add_many(zip(sequences, embedding_list))
+        elif self._can_pipeline(fasta_path):
+            ingest_fasta(self, fasta_path, workers)
         else:
             proteins = read_fasta(fasta_path)
-            with self.Session() as session:
-                session.add_all(
-                    [
-                        ProteinModel(
-                            accession=p.accession,
-                            description=p.description,
-                            locus=p.locus,
-                            organism=p.organism,
-                            sequence=str(p.sequence),
-                            embedding=p.Z,
-                        )
-                        for p in proteins
-                    ]
-                )
-                session.commit()
+            rows = [
+                {
+                    "accession": p.accession,
+                    "description": p.description,
+                    "locus": p.locus,
+                    "organism": p.organism,
+                    "sequence": str(p.sequence),
+                    "embedding": p.Z,
+                }
+                for p in proteins
+            ]
+            if not rows:
+                return
+            vectors = np.stack([r["embedding"] for r in rows])
+            self._check_dim(vectors)
+            with self.engine.begin() as conn:
+                ids = self._insert_proteins(conn, rows)
+            if ids is None:
+                self._load_cache()
+                return
+            self._append(
+                [r["sequence"] for r in rows],
+                vectors,
+                ids,
+                [r["accession"] for r in rows],
+            )
+
+    def _can_pipeline(self, fasta_path: str) -> bool:
+        # Each thread gets its own in-memory SQLite database, so the
+        # background writer can only be used with a persistent database.
+        url = self.engine.url
+        if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+            return False
+        return os.path.getsize(fasta_path) >= PIPELINE_MIN_BYTES
 
     def session(self):
-        """Return a new session object (non-simple mode only)."""
+        """Return a new session object (non-simple mode only).
+
+        Rows written or deleted through it are not seen by the in-memory
+        search cache until :meth:`reload` is called.
+        """
 
         if self.simple:
             raise RuntimeError("session is only available in non-simple mode")
         return self.Session()
 
+    def reload(self) -> None:
+        """Reload the search cache from the database, dropping built indexes."""
+
+        self._load_cache()
+
     # ------------------------------------------------------------------
     # Search helpers
     # ------------------------------------------------------------------
@@ -207,9 +600,112 @@ class ProteinDB:
         if self._embeddings is None:
             raise ValueError("Database is empty")
         if self._index is None:
-            dim = self._embeddings.shape[1]
-            self._index = faiss.IndexFlatL2(dim)
-            self._index.add(self._embeddings)
+            self._index = self._to_gpu(self._read_index() or self._build_index())
+
+    def _to_gpu(self, index: faiss.Index) -> faiss.Index:
+        """Return a GPU copy of ``index`` for large tables, else ``index``."""
+
+        if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+            return index
+        if self._embeddings.size < GPU_MIN_ELEMENTS:
+            return index
+        if isinstance(index, faiss.IndexScalarQuantizer):
+            return index
+        if self._gpu_resources is None:
+            self._gpu_resources = faiss.StandardGpuResources()
+        return faiss.index_cpu_to_gpu(self._gpu_resources, 0, index)
+
+    def _build_index(self) -> faiss.Index:
+        """Build an exact index for small tables and IVF-PQ for large ones."""
+
+        n, dim = self._embeddings.shape
+        if n < IVF_THRESHOLD:
+            qtype = QUANTIZERS[self.quantization]
+            if qtype is None:
+                index = faiss.IndexFlatL2(dim)
+            else:
+                # Scalar quantization stores 2 or 1 bytes per component
+                # instead of 4; distances are computed on the decoded values.
+                index = faiss.IndexScalarQuantizer(dim, qtype)
+                index.train(self._embeddings)
+            index.add(self._embeddings)
+            return index
+
+        # Largest divisor of ``dim`` not above dim / 4 sub-quantizers.
+        m = next(m for m in range(max(dim // 4, 1), 0, -1) if dim % m == 0)
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, int(4 * np.sqrt(n)), m, 8)
+        index.train(self._embeddings)
+        index.add(self._embeddings)
+        index.nprobe = IVF_NPROBE
+        if self.index_path is not None:
+            self._save_index(index, self.index_path)
+        return index
+
+    def _fingerprint(self, n: int) -> str:
+        """Digest identifying the first ``n`` cached rows.
+
+        Covers the row count, a sample of evenly spaced embeddings including
+        the last one and, in full mode, their ids, so a recreated table or a
+        deleted row changes it.
+        """
+
+        rows = np.unique(np.linspace(0, n - 1, FINGERPRINT_ROWS).astype(np.intp))
+        digest = hashlib.sha1(str(n).encode())
+        digest.update(np.ascontiguousarray(self._embeddings[rows]).tobytes())
+        if not self.simple:
+            digest.update(np.asarray(self.ids, dtype=np.int64)[rows].tobytes())
+        return digest.hexdigest()
+
+    def _save_index(self, index: faiss.Index, path: str) -> None:
+        """Write ``index`` to ``path`` with the fingerprint of its rows."""
+
+        faiss.write_index(index, path)
+        meta = {"rows": index.ntotal, "fingerprint": self._fingerprint(index.ntotal)}
+        with open(path + ".meta", "w") as handle:
+            json.dump(meta, handle)
+
+    def _load_index(self, path: str | None) -> faiss.Index | None:
+        """Read the index saved at ``path`` if it was built from these rows.
+
+        Rows inserted since it was saved are added to it.  ``None`` is
+        returned when there is no file, when it has no fingerprint or when
+        the fingerprint does not match the current table.
+        """
+
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path + ".meta") as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        n, dim = self._embeddings.shape
+        rows = meta.get("rows") if isinstance(meta, dict) else None
+        if (
+            not isinstance(rows, int)
+            or not 0 < rows <= n
+            or meta.get("fingerprint") != self._fingerprint(rows)
+        ):
+            return None
+        index = faiss.read_index(path)
+        if index.d != dim or index.ntotal != rows:
+            return None
+        # Rows are appended in id order, so anything newer is a suffix.
+        if rows < n:
+            index.add(self._embeddings[rows:])
+        return index
+
+    def _read_index(self) -> faiss.Index | None:
+        """Load a persisted trained index, adding rows inserted since."""
+
+        if len(self._embeddings) < IVF_THRESHOLD:
+            return None
+        index = self._load_index(self.index_path)
+        if index is None:
+            return None
+        faiss.extract_index_ivf(index).nprobe = IVF_NPROBE
+        return index
 
     def search(self, vector: Sequence[float], k: int = 1000) -> List[str]:
         """Return the ``k`` closest sequences to ``vector`` (simple mode)."""
@@ -218,10 +714,103 @@ class ProteinDB:
         query = np.asarray(vector, dtype=np.float32)[None, :]
         k = min(k, len(self.sequences))
         _dists, idx = self._index.search(query, k)
-        return [self.sequences[i] for i in idx[0]]
+        # Approximate indexes pad with -1 when fewer than ``k`` hits are found.
+        return [self.sequences[i] for i in idx[0] if i >= 0]
+
+    def build_ann_index(
+        self, kind: str = "hnsw", m: int = HNSW_M, path: str | None = None
+    ) -> faiss.Index:
+        """Build an approximate nearest-neighbour index over the embeddings.
+
+        Only ``kind='hnsw'`` (``faiss.IndexHNSWFlat``) is supported. The
+        index is stored as :attr:`ann`, kept up to date on inserts and used
+        by :meth:`search_ann`. It is saved to ``path``, by default next to
+        the SQLite file with a ``.hnsw`` suffix, and an existing file there
+        is reused instead of rebuilding the graph when its fingerprint
+        matches the current rows.
+        """
+
+        if kind != "hnsw":
+            raise ValueError("kind must be 'hnsw'")
+        if self._embeddings is None:
+            raise ValueError("Database is empty")
+        if path is None and self.index_path is not None:
+            path = os.path.splitext(self.index_path)[0] + ".hnsw"
+
+        index = self._load_index(path)
+        if index is None:
+            index = faiss.IndexHNSWFlat(self._embeddings.shape[1], m)
+            index.add(self._embeddings)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        if path is not None:
+            self._save_index(index, path)
+        self.ann = index
+        return index
+
+    def search_ann(
+        self, queries: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search :attr:`ann` like :meth:`search_batch`.
+
+        Rows the graph search could not fill are marked with position -1.
+        """
+
+        if self.ann is None:
+            raise RuntimeError("call build_ann_index() first")
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.float32)
+        return self.ann.search(queries, min(k, len(self.sequences)))
+
+    def squared_norms(self) -> np.ndarray:
+        """Squared L2 norm of every cached embedding, in row order.
+
+        Computed on first use and extended as rows are appended.
+        """
+
+        if self._norms2 is None:
+            n = len(self._embeddings)
+            self._norms_buffer = np.empty(len(self._buffer), dtype=np.float32)
+            self._norms_buffer[:n] = np.einsum(
+                "ij,ij->i", self._embeddings, self._embeddings
+            )
+            self._norms2 = self._norms_buffer[:n]
+        return self._norms2
+
+    def search_batch(
+        self, queries: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact L2 search of many queries against the in-memory matrix.
+
+        Distances are computed as ``||e||^2 - 2 q.e + ||q||^2`` with cached
+        row norms, so the whole batch is one ``(Q, D) @ (D, N)`` product.
+        Works in both modes.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            ``(Q, k)`` squared distances and row positions (indices into
+            ``sequences``/``ids``), nearest first.
+        """
+
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self.sequences))
+        if k <= 0:
+            shape = (len(queries), 0)
+            return np.empty(shape, dtype=np.float32), np.empty(shape, dtype=np.intp)
+        d2 = (
+            self.squared_norms()[None, :]
+            - 2 * (queries @ self._embeddings.T)
+            + np.einsum("ij,ij->i", queries, queries)[:, None]
+        )
+        idx = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        part = np.take_along_axis(d2, idx, axis=1)
+        order = np.argsort(part, axis=1)
+        distances = np.take_along_axis(part, order, axis=1)
+        return distances, np.take_along_axis(idx, order, axis=1)
 
 
 __all__ = [
+    "EmbeddingType",
+    "proteins_fts",
     "ProteinDB",
     "ProteinModel",
     "ProteinSimpleModel",
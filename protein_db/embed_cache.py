@@ -0,0 +1,156 @@
+"""Persistent cache of VAE embeddings keyed by sequence hash."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+from sqlalchemy import Column, LargeBinary, create_engine, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import declarative_base
+
+CacheBase = declarative_base()
+
+# Keep ``IN (...)`` lists well below SQLite's bound-parameter limit.
+_LOOKUP_CHUNK = 500
+
+
+class EmbeddingCacheModel(CacheBase):
+    """SQLAlchemy model mapping a sequence digest to raw ``float32`` bytes."""
+
+    __tablename__ = "embedding_cache"
+
+    key = Column(LargeBinary(20), primary_key=True)
+    embedding = Column(LargeBinary)
+
+
+def sequence_key(sequence: str, namespace: bytes = b"") -> bytes:
+    """Return the SHA-1 digest used as cache key for ``sequence``.
+
+    ``namespace`` identifies the model that produced the embedding, so
+    vectors from different checkpoints never share a key.
+    """
+
+    digest = hashlib.sha1(namespace)
+    digest.update(sequence.encode())
+    return digest.digest()
+
+
+class EmbeddingCache:
+    """In-process LRU layer in front of a persistent embedding table.
+
+    Parameters
+    ----------
+    url:
+        Database URL of the persistent layer.
+    maxsize:
+        Number of vectors kept in memory.
+    flush_every:
+        Number of pending inserts written to the database in one transaction.
+    namespace:
+        Model identity mixed into every key; see :func:`sequence_key`.
+    """
+
+    def __init__(
+        self,
+        url: str = "sqlite:///embedding_cache.db",
+        maxsize: int = 4096,
+        flush_every: int = 256,
+        namespace: bytes = b"",
+    ) -> None:
+        self.engine = create_engine(url)
+        CacheBase.metadata.create_all(self.engine)
+        self.namespace = namespace
+        # Other processes may store the same key between our lookup and
+        # flush, so duplicates are skipped instead of failing the batch.
+        dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(
+            self.engine.dialect.name
+        )
+        if dialect is not None:
+            self._insert = dialect.insert(EmbeddingCacheModel).on_conflict_do_nothing()
+        else:
+            self._insert = insert(EmbeddingCacheModel).prefix_with("IGNORE", dialect="mysql")
+        self.maxsize = maxsize
+        self.flush_every = flush_every
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._pending: Dict[bytes, bytes] = {}
+
+    def _remember(self, key: bytes, vec: np.ndarray) -> None:
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: Iterable[bytes]) -> Dict[bytes, np.ndarray]:
+        """Resolve ``keys`` from memory, pending writes and the database."""
+
+        found: Dict[bytes, np.ndarray] = {}
+        missing: List[bytes] = []
+        for key in dict.fromkeys(keys):
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+                found[key] = vec
+            elif key in self._pending:
+                found[key] = np.frombuffer(self._pending[key], dtype=np.float32)
+            else:
+                missing.append(key)
+
+        if missing:
+            with self.engine.connect() as conn:
+                for start in range(0, len(missing), _LOOKUP_CHUNK):
+                    chunk = missing[start : start + _LOOKUP_CHUNK]
+                    rows = conn.execute(
+                        select(EmbeddingCacheModel.key, EmbeddingCacheModel.embedding)
+                        .where(EmbeddingCacheModel.key.in_(chunk))
+                    )
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32)
+
+        for key, vec in found.items():
+            self._remember(key, vec)
+        return found
+
+    def get(self, sequence: str) -> np.ndarray | None:
+        """Return the cached embedding of ``sequence`` or ``None``."""
+
+        key = sequence_key(sequence, self.namespace)
+        return self._lookup([key]).get(key)
+
+    def get_many(self, sequences: Sequence[str]) -> List[np.ndarray | None]:
+        """Return cached embeddings for ``sequences`` (``None`` on a miss)."""
+
+        keys = [sequence_key(s, self.namespace) for s in sequences]
+        found = self._lookup(keys)
+        return [found.get(k) for k in keys]
+
+    def put(self, sequence: str, embedding: Sequence[float]) -> np.ndarray:
+        """Store ``embedding`` for ``sequence`` and return the cached copy.
+
+        The returned array is read-only because it is shared by every caller
+        asking for the same sequence.
+        """
+
+        key = sequence_key(sequence, self.namespace)
+        vec = np.array(embedding, dtype=np.float32)
+        vec.setflags(write=False)
+        self._pending[key] = vec.tobytes()
+        self._remember(key, vec)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        return vec
+
+    def flush(self) -> None:
+        """Write pending embeddings to the database."""
+
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = [{"key": k, "embedding": v} for k, v in pending.items()]
+        with self.engine.begin() as conn:
+            conn.execute(self._insert, rows)
+
+
+__all__ = ["EmbeddingCache", "EmbeddingCacheModel", "sequence_key"]
@@ -1,23 +1,93 @@
+import multiprocessing
+import os
 import random
-from typing import List, Sequence
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
 
 import numpy as np
 
+try:  # optional: fused scoring kernel
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 from .database import ProteinDB
-from .protein import Protein
+from .protein import embed_many
 
 AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+# Largest number of candidate children embedded in one encoder call.
+CANDIDATE_BLOCK = 64
+# Embeddings remembered within one ``generate_sequences`` run.
+EMBED_CACHE_SIZE = 10_000
+# Individuals per generation and how many of them survive unchanged.
+POPULATION_SIZE = 200
+ELITES = 50
+
+def _as_f32(a) -> np.ndarray:
+    if isinstance(a, np.ndarray) and a.dtype == np.float32 and a.flags.c_contiguous:
+        return a
+    return np.asarray(a, dtype=np.float32)
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-    a = np.asarray(a, dtype=np.float32)
-    b = np.asarray(b, dtype=np.float32)
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    a = _as_f32(a)
+    b = _as_f32(b)
+    return float(np.dot(a, b) / np.sqrt(np.vdot(a, a) * np.vdot(b, b)))
 
 def rmse(a: np.ndarray, b: np.ndarray) -> float:
-    a = np.asarray(a, dtype=np.float32)
-    b = np.asarray(b, dtype=np.float32)
+    a = _as_f32(a)
+    b = _as_f32(b)
     return float(np.sqrt(np.mean((a - b) ** 2)))
 
+if njit is not None:
+
+    # Compiled lazily per argument layout; cached embeddings are read-only
+    # arrays, which an explicit writable signature would reject.
+    @njit(fastmath=True, parallel=True, cache=True)
+    def _score_kernel(E, t, tnorm, out_cos, out_rmse):
+        n, d = E.shape
+        for i in prange(n):
+            dot = 0.0
+            norm_sq = 0.0
+            diff_sq = 0.0
+            for j in range(d):
+                e = E[i, j]
+                dot += e * t[j]
+                norm_sq += e * e
+                diff = e - t[j]
+                diff_sq += diff * diff
+            out_cos[i] = dot / (np.sqrt(norm_sq) * tnorm)
+            out_rmse[i] = np.sqrt(diff_sq / d)
+
+else:
+    _score_kernel = None
+
+def score(target: np.ndarray, embeddings: np.ndarray, target_norm: Optional[float] = None):
+    """Return cosine similarity and RMSE of every row of ``embeddings``.
+
+    Vectorized form of :func:`cosine_similarity` and :func:`rmse` against a
+    single ``target``. Pass ``target_norm`` when scoring repeatedly against
+    the same target.
+    """
+    E = _as_f32(embeddings)
+    t = _as_f32(target)
+    if target_norm is None:
+        target_norm = float(np.sqrt(np.vdot(t, t)))
+    if _score_kernel is not None and E.ndim == 2 and E.shape[1] == t.shape[0]:
+        # One pass per row computes dot, norm and squared error together.
+        cos = np.empty(E.shape[0], dtype=np.float32)
+        error = np.empty(E.shape[0], dtype=np.float32)
+        _score_kernel(np.ascontiguousarray(E), np.ascontiguousarray(t), target_norm, cos, error)
+        return cos, error
+    cos = (E @ t) / (np.sqrt(np.einsum("ij,ij->i", E, E)) * target_norm)
+    diff = E - t
+    error = np.sqrt(np.einsum("ij,ij->i", diff, diff) / E.shape[1])
+    return cos, error
+
+def rank(cos: np.ndarray, error: np.ndarray) -> np.ndarray:
+    """Indices ordering by descending cosine, ties broken by lower RMSE."""
+    return np.lexsort((error, -cos))
+
 def recombine(a: str, b: str) -> str:
     cut = random.randint(1, min(len(a), len(b)) - 1)
     return a[:cut] + b[cut:]
@@ -51,12 +121,183 @@ def mutate(seq: str) -> str:
     else:
         return seq  # no-op fallback
 
+def _embed_cached(seqs: List[str], cache: "OrderedDict[str, np.ndarray]") -> np.ndarray:
+    """Embed ``seqs``, encoding only sequences missing from the LRU ``cache``."""
+    todo = list(dict.fromkeys(s for s in seqs if s not in cache))
+    if todo:
+        for seq, emb in zip(todo, embed_many(todo, use_cache=False)):
+            cache[seq] = emb
+    E = np.stack([cache[s] for s in seqs])
+    for seq in seqs:
+        cache.move_to_end(seq)
+    while len(cache) > EMBED_CACHE_SIZE:
+        cache.popitem(last=False)
+    return E
+
+def _evolve(
+    population: List[str],
+    target: np.ndarray,
+    cos_threshold: float,
+    rmse_threshold: float,
+    generations: int,
+    size: int = POPULATION_SIZE,
+    n_elites: int = ELITES,
+    scores: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+):
+    """Evolve ``population`` for ``generations`` steps.
+
+    ``scores`` are the cosine and RMSE arrays of ``population`` when they
+    are already known, e.g. from a previous island epoch. Returns the final
+    population ranked best first together with its scores in the same
+    order.
+    """
+    tnorm = float(np.sqrt(np.vdot(target, target)))
+    # Children drawn more than once (no-op mutations, repeated crossovers)
+    # are looked up instead of re-encoded.
+    embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+    # Running acceptance counts size each candidate block to what is
+    # expected to fill the population, instead of always encoding a full
+    # block for the last few free slots.
+    drawn = accepted_total = 1
+
+    # Scores travel with the population: survivors and accepted children
+    # were scored when they were created, so only new children are scored.
+    if scores is None:
+        scores = score(target, _embed_cached(population, embeddings), tnorm)
+    cos, error = scores
+    # Two preallocated generations, alternately read and overwritten.
+    buffers = [
+        ([""] * size, np.empty(size, dtype=np.float32), np.empty(size, dtype=np.float32))
+        for _ in range(2)
+    ]
+    for generation in range(generations):
+        next_pop, next_cos, next_error = buffers[generation % 2]
+        elites = rank(cos, error)[:n_elites]
+        filled = len(elites)
+        next_pop[:filled] = [population[i] for i in elites]
+        next_cos[:filled] = cos[elites]
+        next_error[:filled] = error[elites]
+        while filled < size:
+            needed = size - filled
+            block = min(CANDIDATE_BLOCK, -(-needed * drawn // accepted_total))
+            children = []
+            for _ in range(block):
+                op = random.random()
+                if op < 0.25 and len(population) >= 2:
+                    s1, s2 = random.sample(population, 2)
+                    children.append(recombine(s1, s2))
+                else:
+                    children.append(mutate(random.choice(population)))
+            child_cos, child_error = score(
+                target, _embed_cached(children, embeddings), tnorm
+            )
+            accepted = np.flatnonzero(
+                ((1 - child_cos) <= cos_threshold) & (child_error <= rmse_threshold)
+            )
+            drawn += block
+            accepted_total += len(accepted)
+            accepted = accepted[:needed]
+            end = filled + len(accepted)
+            next_pop[filled:end] = [children[i] for i in accepted]
+            next_cos[filled:end] = child_cos[accepted]
+            next_error[filled:end] = child_error[accepted]
+            filled = end
+        population, cos, error = next_pop, next_cos, next_error
+
+    order = rank(cos, error)
+    return [population[i] for i in order], cos[order], error[order]
+
+def _init_island(threads: int) -> None:
+    import torch
+
+    torch.set_num_threads(threads)
+
+def _run_island(seed: int, *args):
+    random.seed(seed)
+    return _evolve(*args)
+
+def _island_model(
+    population: List[str],
+    target: np.ndarray,
+    cos_threshold: float,
+    rmse_threshold: float,
+    generations: int,
+    islands: int,
+    migration_interval: int,
+    migrants: int,
+) -> List[str]:
+    """Run the GA on ``islands`` sub-populations in separate processes.
+
+    Every ``migration_interval`` generations the best ``migrants`` of each
+    island replace the worst members of the next island (ring topology).
+    """
+    size = POPULATION_SIZE // islands
+    n_elites = max(1, ELITES // islands)
+    migrants = min(migrants, size - 1)
+    groups = [population[i::islands] for i in range(islands)]
+    # Scores of every group after the first epoch; migrants bring theirs
+    # along, so no island rescores a sequence it was handed.
+    scores = [None] * islands
+    threads = max(1, (os.cpu_count() or 1) // islands)
+    # Spawned workers load their own model instead of forking the parent's
+    # torch thread pools.
+    with ProcessPoolExecutor(
+        islands,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_island,
+        initargs=(threads,),
+    ) as pool:
+        done = 0
+        while True:
+            step = min(migration_interval, generations - done)
+            futures = [
+                pool.submit(
+                    _run_island,
+                    random.getrandbits(32),
+                    group,
+                    target,
+                    cos_threshold,
+                    rmse_threshold,
+                    step,
+                    size,
+                    n_elites,
+                    group_scores,
+                )
+                for group, group_scores in zip(groups, scores)
+            ]
+            results = [f.result() for f in futures]
+            done += step
+            if done >= generations:
+                break
+            keep = size - migrants
+            groups = [
+                ranked[:keep] + results[i - 1][0][:migrants]
+                for i, (ranked, _cos, _error) in enumerate(results)
+            ]
+            scores = [
+                (
+                    np.concatenate([cos[:keep], results[i - 1][1][:migrants]]),
+                    np.concatenate([error[:keep], results[i - 1][2][:migrants]]),
+                )
+                for i, (_ranked, cos, error) in enumerate(results)
+            ]
+
+    seqs = [seq for ranked, _cos, _error in results for seq in ranked]
+    cos = np.concatenate([c for _ranked, c, _error in results])
+    error = np.concatenate([e for _ranked, _cos, e in results])
+    # Migrants can sit on several islands; report each sequence once.
+    best = dict.fromkeys(seqs[i] for i in rank(cos, error))
+    return list(best)[:5]
+
 def generate_sequences(
     db: ProteinDB,
     vector: Sequence[float],
     cos_threshold: float = 0.1,
     rmse_threshold: float = 0.1,
     generations: int = 10,
+    islands: int = 1,
+    migration_interval: int = 5,
+    migrants: int = 5,
 ) -> List[str]:
     """Generate sequences close to ``vector`` using a simple genetic algorithm.
 
@@ -72,51 +313,52 @@ def generate_sequences(
         Maximum allowed RMSE for accepting mutations.
     generations:
         Number of generations to evolve.
+    islands:
+        Number of sub-populations evolved in parallel processes, at most
+        ``POPULATION_SIZE // 2``. ``1`` runs the GA in the calling process.
+        Workers are spawned and load their
+        own model, so scripts must call this under
+        ``if __name__ == "__main__"``.
+    migration_interval:
+        Generations between migrations when ``islands > 1``; at least 1.
+    migrants:
+        Sequences each island sends to its neighbour per migration.
 
     Returns
     -------
     List[str]
-        Five sequences most similar to ``vector``.
+        Up to five distinct sequences most similar to ``vector``.
     """
 
+    if not 1 <= islands <= POPULATION_SIZE // 2:
+        raise ValueError(f"islands must be between 1 and {POPULATION_SIZE // 2}")
+    if migration_interval < 1:
+        raise ValueError("migration_interval must be at least 1")
+    if migrants < 0:
+        raise ValueError("migrants must not be negative")
+
     target = np.asarray(vector, dtype=np.float32)
     population = db.search(target, k=100)
     if len(population) < 100:
         population = list(population)
     else:
         population = list(population)
-    while len(population) < 200:
+    while len(population) < POPULATION_SIZE:
         population.append(mutate(random.choice(population)))
 
-    for _ in range(generations):
-        scored = []
-        for seq in population:
-            emb = Protein("tmp", "", "", "", seq).Z
-            cos = cosine_similarity(target, emb)
-            error = rmse(target, emb)
-            scored.append((cos, error, seq))
-        scored.sort(key=lambda x: (-x[0], x[1]))
-        elites = [s[2] for s in scored[:50]]
-        next_pop = elites.copy()
-        while len(next_pop) < 200:
-            op = random.random()
-            if op < 0.25 and len(population) >= 2:
-                s1, s2 = random.sample(population, 2)
-                child = recombine(s1, s2)
-            else:
-                child = mutate(random.choice(population))
-            emb = Protein("tmp", "", "", "", child).Z
-            cos = cosine_similarity(target, emb)
-            error = rmse(target, emb)
-            if (1 - cos) <= cos_threshold and error <= rmse_threshold:
-                next_pop.append(child)
-        population = next_pop
-
-    final_scores = []
-    for seq in population:
-        emb = Protein("tmp", "", "", "", seq).Z
-        cos = cosine_similarity(target, emb)
-        error = rmse(target, emb)
-        final_scores.append((cos, error, seq))
-    final_scores.sort(key=lambda x: (-x[0], x[1]))
-    return [s[2] for s in final_scores[:5]]
+    if islands > 1:
+        return _island_model(
+            population,
+            target,
+            cos_threshold,
+            rmse_threshold,
+            generations,
+            islands,
+            migration_interval,
+            migrants,
+        )
+    ranked, _cos, _error = _evolve(
+        population, target, cos_threshold, rmse_threshold, generations
+    )
+    # Elites are copied unchanged, so a sequence can fill several slots.
+    return list(dict.fromkeys(ranked))[:5]
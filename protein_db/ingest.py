@@ -0,0 +1,216 @@
+"""Pipelined FASTA ingestion: parse, encode and insert run concurrently.
+
+Large FASTA files are split into byte ranges that start on a record header.
+A process pool parses the ranges, the calling thread encodes the parsed
+sequences in batches and a background thread writes finished batches to the
+database in a single transaction.  Bounded queues between the stages keep
+memory usage flat.
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+from .protein import describe, embed_many
+
+# Files smaller than this are ingested serially; the pool start-up cost is
+# not worth it below roughly this size.
+PIPELINE_MIN_BYTES = 100 * 1024 * 1024
+# Approximate size of the byte range handed to a single parser process.
+CHUNK_BYTES = 8 * 1024 * 1024
+# Batches waiting between two stages.
+QUEUE_SIZE = 4
+
+Record = Tuple[str, str, str, str, str]
+
+
+def fasta_chunks(path: str, chunk_bytes: int = CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """Split ``path`` into ``(start, end)`` byte ranges aligned on headers.
+
+    Every range except possibly the first starts at a line beginning with
+    ``>``, so each one can be parsed on its own.
+    """
+
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, "rb") as handle:
+        pos = chunk_bytes
+        while pos < size:
+            handle.seek(pos)
+            handle.readline()  # skip the partial line ``pos`` points into
+            while True:
+                line_start = handle.tell()
+                line = handle.readline()
+                if not line or line.startswith(b">"):
+                    break
+            if not line:
+                break
+            offsets.append(line_start)
+            pos = line_start + chunk_bytes
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def parse_chunk(path: str, start: int, end: int) -> List[Record]:
+    """Parse the records in ``path[start:end]``.
+
+    Returns ``(accession, description, locus, organism, sequence)`` tuples.
+    """
+
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        text = handle.read(end - start).decode()
+    return [
+        (*describe(title), seq)
+        for title, seq in SimpleFastaParser(io.StringIO(text))
+    ]
+
+
+def _pool_context():
+    """Start method for the parser pool.
+
+    Forked workers inherit the already imported modules. Spawned ones
+    re-import ``protein_db`` and with it torch and the VAE, only to split
+    FASTA text, so ``fork`` is used wherever the platform has it.
+    """
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def _parsed_chunks(pool: ProcessPoolExecutor, path: str, workers: int):
+    """Return an iterator over parsed chunks in file order.
+
+    The first ``2 * workers`` chunks are submitted before this returns,
+    which starts the pool's processes; later ones are submitted as results
+    are consumed, keeping a bounded number in flight.
+    """
+
+    ranges = iter(fasta_chunks(path))
+    pending: deque = deque()
+
+    def submit() -> None:
+        span = next(ranges, None)
+        if span is not None:
+            pending.append(pool.submit(parse_chunk, path, *span))
+
+    def results():
+        while pending:
+            records = pending.popleft().result()
+            submit()
+            yield records
+
+    for _ in range(2 * workers):
+        submit()
+    return results()
+
+
+def ingest_fasta(db, path: str, workers: int | None = None, batch_size: int = 4096) -> None:
+    """Insert every record of ``path`` into the full-mode database ``db``.
+
+    Parsing is spread over ``workers`` processes, embeddings are computed in
+    the calling thread ``batch_size`` sequences at a time and rows are
+    written by a background thread. All rows go in one transaction, so a
+    failure part-way through leaves the table unchanged.
+
+    On platforms without ``fork`` (Windows) the workers are spawned and
+    re-import the calling script, which therefore needs an
+    ``if __name__ == "__main__":`` guard.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    batches: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    errors: List[BaseException] = []
+    # (sequences, embeddings, ids, accessions) per batch, applied to the
+    # in-memory cache once the transaction has committed.
+    written: list = []
+
+    def write() -> None:
+        drained = False
+        try:
+            with db.engine.begin() as conn:
+                for rows in iter(batches.get, None):
+                    if errors:
+                        continue  # keep draining so the producer never blocks
+                    written.append(
+                        (
+                            [r["sequence"] for r in rows],
+                            np.stack([r["embedding"] for r in rows]),
+                            db._insert_proteins(conn, rows),
+                            [r["accession"] for r in rows],
+                        )
+                    )
+                drained = True
+                if errors:
+                    # Leaving the block with an exception rolls back.
+                    raise RuntimeError("FASTA ingestion aborted")
+        except BaseException as exc:
+            if not errors:
+                errors.append(exc)
+            if not drained:
+                for _rows in iter(batches.get, None):
+                    pass
+
+    with ProcessPoolExecutor(workers, mp_context=_pool_context()) as pool:
+        # Fork the parsers before the writer thread exists.
+        chunks = _parsed_chunks(pool, path, workers)
+        writer = threading.Thread(target=write, name="proteindb-ingest", daemon=True)
+        writer.start()
+        try:
+            for records in chunks:
+                for start in range(0, len(records), batch_size):
+                    if errors:
+                        break
+                    batch = records[start : start + batch_size]
+                    Z = embed_many([r[4] for r in batch], use_cache=False)
+                    batches.put(
+                        [
+                            {
+                                "accession": acc,
+                                "description": desc,
+                                "locus": locus,
+                                "organism": org,
+                                "sequence": seq,
+                                "embedding": z,
+                            }
+                            for (acc, desc, locus, org, seq), z in zip(batch, Z)
+                        ]
+                    )
+                if errors:
+                    break
+        except BaseException as exc:
+            errors.append(exc)
+            raise
+        finally:
+            batches.put(None)
+            writer.join()
+    if errors:
+        raise errors[0]
+
+    # Without RETURNING the ids of later batches cannot be told apart from
+    # earlier uncommitted ones; reload instead.
+    if any(ids is None for _seqs, _Z, ids, _accs in written):
+        db._load_cache()
+        return
+    for sequences, Z, ids, accessions in written:
+        db._append(sequences, Z, ids, accessions)
+
+
+__all__ = [
+    "CHUNK_BYTES",
+    "PIPELINE_MIN_BYTES",
+    "fasta_chunks",
+    "ingest_fasta",
+    "parse_chunk",
+]
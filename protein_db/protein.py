@@ -1,23 +1,133 @@
-from vae_module import Tokenizer, Config, load_vae, encode
+from vae_module import Tokenizer, Config, load_vae, encode_sequences
 from Bio import SeqIO
-import re
+import atexit
+import os
 import numpy as np
-cfg = Config(model_path="models/vae_epoch380.pt")
+import torch
+from .embed_cache import EmbeddingCache
+cfg = Config(
+    model_path="models/vae_epoch380.pt",
+    device="cuda" if torch.cuda.is_available() else "cpu",
+)
+amp_dtype = getattr(torch, cfg.amp_dtype) if cfg.amp_dtype else None
+# Autocast only applies on CUDA; this is the precision vectors are made in.
+precision = str(amp_dtype) if amp_dtype and cfg.device == "cuda" else "float32"
 tok = Tokenizer.from_esm()
 
 model = load_vae(cfg,
                  vocab_size=len(tok.vocab),
                  pad_idx=tok.pad_idx,
                  bos_idx=tok.bos_idx)
+latent_dim = model.to_mu.out_features
+
+
+def model_identity():
+    """Bytes identifying the loaded checkpoint, used to namespace the cache.
+
+    Combines the checkpoint path, modification time and size with the
+    latent dimension and inference precision, so replacing the model or
+    switching precision invalidates cached vectors.
+    """
+    path = os.path.abspath(cfg.model_path)
+    st = os.stat(path)
+    return f"{path}:{st.st_mtime_ns}:{st.st_size}:{latent_dim}:{precision}".encode()
+
+
+# Database URL of the persistent embedding cache, read on first use.
+# ``PROTEINDB_EMBED_CACHE=off`` (or an empty value) disables it.
+DEFAULT_CACHE_URL = "sqlite:///embedding_cache.db"
+_cache = None
+
+
+def get_cache():
+    """Return the shared :class:`EmbeddingCache`, or ``None`` if disabled.
+
+    The cache is created on first use, so importing the package does not
+    touch the filesystem.
+    """
+    global _cache
+    if _cache is None:
+        url = os.environ.get("PROTEINDB_EMBED_CACHE", DEFAULT_CACHE_URL)
+        if url.strip().lower() in ("", "off", "none", "0"):
+            return None
+        _cache = EmbeddingCache(url, namespace=model_identity())
+        atexit.register(_cache.flush)
+    return _cache
+
+
+def _encode(seq):
+    """Encode one sequence with the same precision as :func:`embed_many`."""
+    return encode_sequences(model, [seq], tok, cfg.max_len, 1, amp_dtype)[0].numpy()
+
+
+def embed(seq, use_cache=True):
+    """Return the latent vector of a single sequence as ``float32``.
+
+    Vectors are looked up in the embedding cache first, so repeated queries
+    for the same sequence skip the VAE forward pass. Pass
+    ``use_cache=False`` for throwaway sequences that should not be stored.
+    """
+    cache = get_cache() if use_cache else None
+    if cache is None:
+        return _encode(seq)
+    z = cache.get(seq)
+    if z is None:
+        z = cache.put(seq, _encode(seq))
+    return z
+
+
+def embed_many(seqs, batch_size=cfg.batch_size, use_cache=True):
+    """Return an ``(N, latent_dim)`` ``float32`` array for many sequences.
+
+    Cached sequences are reused; the rest are encoded in batches of
+    ``batch_size`` instead of one forward pass per sequence.
+    """
+    seqs = list(seqs)
+    cache = get_cache() if use_cache else None
+    if cache is None:
+        # Encode each distinct sequence once and scatter the rows back.
+        unique = {s: i for i, s in enumerate(dict.fromkeys(seqs))}
+        Z = encode_sequences(
+            model, list(unique), tok, cfg.max_len, batch_size, amp_dtype
+        ).numpy()
+        if len(unique) == len(seqs):
+            return Z
+        return Z[[unique[s] for s in seqs]]
+    cached = cache.get_many(seqs)
+    todo = list(dict.fromkeys(s for s, z in zip(seqs, cached) if z is None))
+    if todo:
+        new = encode_sequences(model, todo, tok, cfg.max_len, batch_size, amp_dtype).numpy()
+        fresh = {s: cache.put(s, z) for s, z in zip(todo, new)}
+        cached = [fresh[s] if z is None else z for s, z in zip(seqs, cached)]
+    if not seqs:
+        return np.empty((0, latent_dim), dtype=np.float32)
+    return np.stack(cached)
+
 
 class Protein:
-    def __init__(self,accession, description, locus, organism,seq):
+    def __init__(self,accession, description, locus, organism,seq, Z=None):
         self.accession = accession
         self.description = description
         self.locus = locus
         self.organism = organism
         self.sequence = seq
-        self.Z=np.array(encode(model, seq, tok, cfg.max_len))
+        self._Z = None if Z is None else np.asarray(Z, dtype=np.float32)
+
+    @property
+    def Z(self):
+        """Latent vector, encoded on first access unless already attached."""
+        if self._Z is None:
+            self._Z = embed(self.sequence)
+        return self._Z
+
+    @Z.setter
+    def Z(self, z):
+        self.attach_embedding(z)
+
+    def attach_embedding(self, z):
+        """Set a precomputed latent vector, e.g. from :func:`embed_many`."""
+        self._Z = np.asarray(z, dtype=np.float32)
+
     def __len__(self):
         return len(self.sequence)
     def __getitem__(self,idx):
@@ -25,21 +135,21 @@ class Protein:
     def __sub__(self,other):
         return abs(self.Z-other.Z)
     def __repr__(self):
-        return str({
-            "accession": self.accession,
-            "description": self.description,
-            "locus": self.locus,
-            "organism": self.organism,
-            "sequence": self.sequence,
-        })
-    def __str__(self):
-        return str({
+        return (
+            f"Protein(acc={self.accession!r}, org={self.organism!r}, "
+            f"len={len(self.sequence)})"
+        )
+    __str__ = __repr__
+
+    def to_dict(self):
+        """Return the record fields as a plain dictionary."""
+        return {
             "accession": self.accession,
             "description": self.description,
             "locus": self.locus,
             "organism": self.organism,
             "sequence": self.sequence,
-        })
+        }
 
 def describe(description):
     # accession (첫 번째 필드)
@@ -47,12 +157,13 @@ def describe(description):
     accession = parts[0]
     rest = parts[1] if len(parts) > 1 else ""
 
-    # 유기체명 (대괄호 안)
-    org_match = re.search(r"\[([^\]]+)\]$", rest)
-    organism = org_match.group(1) if org_match else ""
-
-    # 유기체명 제거
-    rest = re.sub(r"\s*\[[^\]]+\]$", "", rest)
+    # 유기체명 (끝의 대괄호 안) - 정규식 대신 문자열 탐색으로 한 번에 추출/제거
+    organism = ""
+    if rest.endswith("]"):
+        start = rest.find("[", rest.rfind("]", 0, -1) + 1, -1)
+        if start != -1 and start < len(rest) - 2:
+            organism = rest[start + 1 : -1]
+            rest = rest[:start].rstrip()
 
     # 나머지 설명과 로커스 분리
     # 예시: "hypothetical protein TI39_contig5958g00003"
@@ -63,4 +174,3 @@ def describe(description):
         description, locus = rest, ""
 
     return accession,description,locus,organism
-
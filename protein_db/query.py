@@ -1,18 +1,22 @@
 """Query utilities for the SQLAlchemy protein database."""
-"""Query utilities for the SQLAlchemy protein database."""
 
 from typing import List
 
 import numpy as np
+from sqlalchemy import select
+
+from .database import ProteinDB, ProteinModel, proteins_fts
+from .protein import embed
 
-from .database import ProteinDB, ProteinModel
-from .protein import Protein
+# Ids per ``IN (...)`` list, well below SQLite's bound-parameter limit.
+_FETCH_CHUNK = 500
 
 
 class ProteinQuery:
     """Convenience wrapper providing common protein queries."""
 
     def __init__(self, db: ProteinDB):
+        self.db = db
         self.Session = db.Session
 
     def by_accession(self, accession: str) -> List[ProteinModel]:
@@ -40,22 +44,49 @@ class ProteinQuery:
         """Return proteins whose description contains the given text."""
 
         pattern = f"%{text}%"
+        if self.db.fts:
+            # Trigram FTS5 answers case-insensitive substring LIKE from its
+            # index instead of scanning every description.
+            condition = ProteinModel.id.in_(
+                select(proteins_fts.c.rowid).where(
+                    proteins_fts.c.description.like(pattern)
+                )
+            )
+        else:
+            condition = ProteinModel.description.ilike(pattern)
         with self.Session() as session:
             return (
                 session.query(ProteinModel)
-                .filter(ProteinModel.description.ilike(pattern))
+                .filter(condition)
+                .order_by(ProteinModel.id)
                 .all()
             )
 
+    def _rows(self, ids: List[int]) -> List[ProteinModel]:
+        """Fetch the ORM rows for ``ids``, returned in the order given.
+
+        Ids whose rows were deleted since the cache was loaded are skipped.
+        """
+
+        found = {}
+        with self.Session() as session:
+            for start in range(0, len(ids), _FETCH_CHUNK):
+                chunk = ids[start : start + _FETCH_CHUNK]
+                for p in session.query(ProteinModel).filter(ProteinModel.id.in_(chunk)):
+                    found[p.id] = p
+        return [found[i] for i in ids if i in found]
+
     def similar_sequence(self, sequence: str, top: int = 5) -> List[ProteinModel]:
         """Return proteins with embeddings closest to the given sequence."""
 
-        query_protein = Protein("query", "", "", "", sequence)
-        target = query_protein.Z
-        with self.Session() as session:
-            proteins = session.query(ProteinModel).all()
-        proteins.sort(key=lambda p: np.linalg.norm(p.embedding - target))
-        return proteins[:top]
+        target = embed(sequence)
+        if not self.db.ids:
+            return []
+        if self.db.ann is not None:
+            _d2, best = self.db.search_ann(target[None, :], top)
+        else:
+            _d2, best = self.db.search_batch(target[None, :], top)
+        return self._rows([self.db.ids[i] for i in best[0] if i >= 0])
 
     def by_embedding(
         self, sequence: str, threshold: float, metric: str = "euclidean"
@@ -73,25 +104,20 @@ class ProteinQuery:
             Either ``'euclidean'`` or ``'cosine'``.
         """
 
-        query_protein = Protein("query", "", "", "", sequence)
-        target = query_protein.Z
-        with self.Session() as session:
-            proteins = session.query(ProteinModel).all()
-
-        good = []
-        for p in proteins:
-            emb = p.embedding
-            if metric == "cosine":
-                sim = float(
-                    np.dot(emb, target)
-                    / (np.linalg.norm(emb) * np.linalg.norm(target))
-                )
-                if sim >= threshold:
-                    good.append(p)
-            elif metric == "euclidean":
-                dist = float(np.linalg.norm(emb - target))
-                if dist <= threshold:
-                    good.append(p)
-            else:
-                raise ValueError("metric must be 'euclidean' or 'cosine'")
-        return good
+        if metric not in ("euclidean", "cosine"):
+            raise ValueError("metric must be 'euclidean' or 'cosine'")
+        target = embed(sequence)
+        if not self.db.ids:
+            return []
+
+        # Both metrics come from one matrix-vector product and the cached
+        # squared row norms of the in-memory embedding matrix.
+        dots = self.db.embeddings @ target
+        norms2 = self.db.squared_norms()
+        target_sq = float(np.vdot(target, target))
+        if metric == "cosine":
+            keep = dots / np.sqrt(norms2 * target_sq) >= threshold
+        else:
+            dist = np.sqrt(np.maximum(norms2 - 2 * dots + target_sq, 0))
+            keep = dist <= threshold
+        return self._rows([self.db.ids[i] for i in np.flatnonzero(keep)])
@@ -1,16 +1,19 @@
 """Visualization utilities for protein embeddings."""
 
-from typing import List
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List
 
-import matplotlib.pyplot as plt
 import numpy as np
-from sklearn.decomposition import PCA
 
 from .database import ProteinModel
-from .protein import Protein
+from .protein import embed
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 
-def plot_embeddings(proteins: List[ProteinModel], query_sequence: str) -> plt.Figure:
+def plot_embeddings(proteins: List[ProteinModel], query_sequence: str) -> Figure:
     """Plot protein embeddings with the query highlighted.
 
     Parameters
@@ -26,10 +29,21 @@ def plot_embeddings(proteins: List[ProteinModel], query_sequence: str) -> plt.Fi
         Figure object containing a 2D PCA scatter plot of embeddings.
     """
 
-    query_embedding = Protein("query", "", "", "", query_sequence).Z
-    embeddings = [p.embedding for p in proteins] + [query_embedding]
-    pca = PCA(n_components=2)
-    reduced = pca.fit_transform(np.vstack(embeddings))
+    # Imported here so that importing the package does not load matplotlib
+    # and scikit-learn.
+    import matplotlib.pyplot as plt
+    from sklearn.decomposition import PCA
+
+    query_embedding = embed(query_sequence)
+    X = np.empty((len(proteins) + 1, len(query_embedding)), dtype=np.float32)
+    for i, p in enumerate(proteins):
+        X[i] = p.embedding
+    X[-1] = query_embedding
+    # The default solver already avoids a full SVD for two components
+    # (covariance eigendecomposition for tall inputs, randomized otherwise);
+    # ``random_state`` keeps the randomized case reproducible.
+    pca = PCA(n_components=2, random_state=0)
+    reduced = pca.fit_transform(X)
 
     fig, ax = plt.subplots()
     ax.scatter(reduced[:-1, 0], reduced[:-1, 1], label="proteins")
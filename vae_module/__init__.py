@@ -2,10 +2,21 @@
 
 from .config import Config, load_config
 from .loader import load_vae
-from .encoder import encode, encode_batch, encode_long, encode_long_batch
+from .encoder import (
+    encode,
+    encode_batch,
+    encode_sequences,
+    encode_long,
+    encode_long_batch,
+)
 from .decoder import decode, decode_batch
 from .classes import SequenceDataset, Tokenizer
-from .utils import sequence_to_tensor, tensor_to_sequence, pad_collate
+from .utils import (
+    sequence_to_tensor,
+    sequences_to_tensor,
+    tensor_to_sequence,
+    pad_collate,
+)
 from .logger import setup_logger
 from .exceptions import (
     VAEError,
@@ -20,6 +31,7 @@ __all__ = [
     "load_vae",
     "encode",
     "encode_batch",
+    "encode_sequences",
     "encode_long",
     "encode_long_batch",
     "decode",
@@ -27,6 +39,7 @@ __all__ = [
     "SequenceDataset",
     "Tokenizer",
     "sequence_to_tensor",
+    "sequences_to_tensor",
     "tensor_to_sequence",
     "pad_collate",
     "setup_logger",
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import ClassVar, List, Sequence
 from typing import List, Sequence
 
+import numpy as np
 import torch
 from torch.utils.data import Dataset
 
@@ -64,6 +65,11 @@ class Tokenizer:
         self.tok_to_idx = {t: i for i, t in enumerate(self.idx_to_tok)}
         self.pad_idx = self.tok_to_idx[self.pad_token]
         self.bos_idx = self.tok_to_idx[self.bos_token]
+        # ASCII code -> token id for single-character tokens, -1 elsewhere.
+        self.lut = np.full(128, -1, dtype=np.int64)
+        for tok, idx in self.tok_to_idx.items():
+            if len(tok) == 1 and ord(tok) < 128:
+                self.lut[ord(tok)] = idx
 
     def get_idx(self, token: str) -> int:
         return self.tok_to_idx[token]
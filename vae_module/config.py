@@ -1,7 +1,7 @@
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import yaml
 
@@ -14,6 +14,11 @@ class Config:
     device: str = "cpu"
     batch_size: int = 64
     max_len: int = 512
+    # Compile the encoder with ``torch.compile`` when loading the model.
+    compile: bool = False
+    # Autocast dtype for batched encoding on CUDA ("bfloat16", "float16" or
+    # ``None`` for full precision). Ignored on CPU.
+    amp_dtype: Optional[str] = "bfloat16"
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Config":
@@ -1,27 +1,41 @@
-from typing import List
+from contextlib import contextmanager
+from typing import List, Optional, Sequence
 
+import numpy as np
 import torch
 from torch.utils.data import DataLoader
 
 from .exceptions import InvalidSequenceError, SequenceLengthError
 from .logger import setup_logger
-from .utils import sequence_to_tensor
+from .utils import sequence_to_tensor, sequences_to_tensor
 from .classes import Tokenizer
 from .model import VAETransformerDecoder
 
 logger = setup_logger(__name__)
 
 
+@contextmanager
+def _inference(device: torch.device, amp_dtype: Optional[torch.dtype] = None):
+    """Inference context for ``device``; on CUDA ``amp_dtype`` enables autocast."""
+    with torch.inference_mode():
+        if device.type == "cuda" and amp_dtype is not None:
+            with torch.autocast("cuda", dtype=amp_dtype):
+                yield
+        else:
+            yield
+
+
 def encode(model: VAETransformerDecoder, seq: str, tokenizer: Tokenizer, max_len: int) -> torch.Tensor:
     """Encode a single sequence into a latent vector."""
     model.eval()
-    with torch.no_grad():
-        x = sequence_to_tensor(seq, tokenizer, max_len).unsqueeze(0).to(next(model.parameters()).device)
-        mask = x != tokenizer.pad_idx
-        _, mu, logvar, *_ = model(x, mask)
+    device = next(model.parameters()).device
+    with _inference(device):
+        x = sequence_to_tensor(seq, tokenizer, max_len).unsqueeze(0).to(device)
+        mu, logvar = model.encode(x)
         z = mu #+ torch.randn_like(mu) * torch.exp(0.5 * logvar)
         logger.debug("Encoded sequence length %d", len(seq))
-        return z.squeeze(0)
+    # Cloning outside inference mode hands callers an ordinary tensor.
+    return z.squeeze(0).clone()
 
 
 def encode_batch(model: VAETransformerDecoder, loader: DataLoader, tokenizer: Tokenizer) -> torch.Tensor:
@@ -29,18 +43,51 @@ def encode_batch(model: VAETransformerDecoder, loader: DataLoader, tokenizer: To
     model.eval()
     zs = []
     device = next(model.parameters()).device
-    with torch.no_grad():
+    with _inference(device):
         for x in loader:
             if isinstance(x, (list, tuple)):
                 x = x[0]
             x = x.to(device)
-            mask = x != tokenizer.pad_idx
-            _, mu, logvar, *_ = model(x, mask)
+            mu, logvar = model.encode(x)
             z = mu #+ torch.randn_like(mu) * torch.exp(0.5 * logvar)
             zs.append(z.cpu())
     return torch.cat(zs, dim=0)
 
 
+def encode_sequences(
+    model: VAETransformerDecoder,
+    sequences: Sequence[str],
+    tokenizer: Tokenizer,
+    max_len: int,
+    batch_size: int = 64,
+    amp_dtype: Optional[torch.dtype] = None,
+) -> torch.Tensor:
+    """Encode a list of sequences with one forward pass per mini-batch.
+
+    Sequences are grouped by length to keep padding small, padded with the
+    pad token and encoded ``batch_size`` at a time. Only the encoder half of
+    the model is run. On CUDA the forward pass runs under autocast with
+    ``amp_dtype`` when given; the result is always ``float32`` on the CPU.
+    The returned tensor has one latent vector per input, in the order of
+    ``sequences``.
+    """
+    model.eval()
+    device = next(model.parameters()).device
+    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+    order = torch.from_numpy(np.argsort(lengths, kind="stable"))
+    z = torch.empty(len(sequences), model.to_mu.out_features)
+    with _inference(device, amp_dtype):
+        for start in range(0, len(order), batch_size):
+            idx = order[start : start + batch_size]
+            x = sequences_to_tensor(
+                [sequences[i] for i in idx.tolist()], tokenizer, max_len
+            ).to(device, non_blocking=True)
+            mu, _logvar = model.encode(x)
+            z[idx] = mu.float().cpu()
+    logger.debug("Encoded %d sequences", len(sequences))
+    return z
+
+
 def encode_long(
     model: VAETransformerDecoder,
     seq: str,
@@ -78,12 +125,11 @@ def encode_long(
 
     device = next(model.parameters()).device
     x = torch.stack(segments).to(device)
-    mask = x != tokenizer.pad_idx
     model.eval()
-    with torch.no_grad():
-        _, mu, logvar, *_ = model(x, mask)
+    with _inference(device):
+        mu, logvar = model.encode(x)
         z = mu
-    return z.cpu()
+    return z.cpu().clone()
 
 
 def encode_long_batch(
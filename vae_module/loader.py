@@ -8,6 +8,23 @@ from .model import SmallTransformer, VAETransformerDecoder, EMB_DIM, NUM_LAYERS,
 logger = setup_logger(__name__)
 
 
+def _skip_fast_path(model: torch.nn.Module) -> None:
+    """Run this model's transformer encoders on the regular attention path.
+
+    On CPU the fused ``nn.TransformerEncoderLayer`` kernel and the
+    nested-tensor conversion of padded batches are slower than the plain
+    modules. Torch leaves a layer off its fast path while it has forward
+    hooks, so a no-op pre-hook opts out this model only, without touching
+    the process-wide ``torch.backends.mha`` switch.
+    """
+    for module in model.modules():
+        if isinstance(module, torch.nn.TransformerEncoder):
+            module.enable_nested_tensor = False
+            module.use_nested_tensor = False
+        elif isinstance(module, torch.nn.TransformerEncoderLayer):
+            module.register_forward_pre_hook(lambda _module, _args: None)
+
+
 def load_vae(cfg: Config, vocab_size: int, pad_idx: int, bos_idx: int) -> VAETransformerDecoder:
     """Load VAE model from checkpoint defined in Config."""
     device = torch.device(cfg.device)
@@ -34,5 +51,14 @@ def load_vae(cfg: Config, vocab_size: int, pad_idx: int, bos_idx: int) -> VAETra
     checkpoint = torch.load(cfg.model_path, map_location=device)
     model.load_state_dict(checkpoint["model_sd"])
     model.eval()
+    if device.type == "cpu":
+        _skip_fast_path(model)
+    if cfg.compile:
+        # Compile in place so state_dict keys are unchanged. Only the encoder
+        # is compiled; it is the part used for embedding. A warm-up call moves
+        # compilation out of the first real query.
+        model.encoder.compile(dynamic=True)
+        with torch.inference_mode():
+            model.encode(torch.full((2, 8), bos_idx, dtype=torch.long, device=device))
     logger.info("Loaded VAE from %s on %s", cfg.model_path, device)
     return model
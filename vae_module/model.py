@@ -67,6 +67,12 @@ class VAETransformerDecoder(nn.Module):
         self.decoder = nn.TransformerDecoder(layer, num_layers)
         self.out = nn.Linear(emb_dim, vocab_size)
 
+    def encode(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Return ``mu`` and ``logvar`` for ``x`` without running the decoder."""
+        h_enc, enc_mask = self.encoder(x)
+        pooled = (h_enc * enc_mask.unsqueeze(-1)).sum(1) / enc_mask.sum(1, True)
+        return self.to_mu(pooled), self.to_logvar(pooled)
+
     def forward(self, x: torch.Tensor, mask: torch.Tensor):
         h_enc, enc_mask = self.encoder(x)
         pooled = (h_enc * enc_mask.unsqueeze(-1)).sum(1) / enc_mask.sum(1, True)
@@ -1,18 +1,55 @@
-from typing import List
+from typing import List, Sequence
 
+import numpy as np
 import torch
 
 from .exceptions import InvalidSequenceError, SequenceLengthError
 
 
+def _lookup(seq: str, tokenizer: "Tokenizer") -> np.ndarray:
+    """Map ``seq`` to token ids through the tokenizer's ASCII lookup table."""
+    try:
+        codes = np.frombuffer(seq.encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        raise InvalidSequenceError(seq) from None
+    ids = tokenizer.lut[codes]
+    if (ids < 0).any():
+        raise InvalidSequenceError(seq)
+    return ids
+
+
 def sequence_to_tensor(seq: str, tokenizer: "Tokenizer", max_len: int) -> torch.LongTensor:
     """Convert a string sequence to tensor of token IDs."""
-    if any(c not in tokenizer.vocab for c in seq):
-        raise InvalidSequenceError(seq)
+    ids = _lookup(seq, tokenizer)
     if len(seq) > max_len:
         raise SequenceLengthError(len(seq), max_len)
-    ids = [tokenizer.get_idx(c) for c in seq]
-    return torch.tensor(ids, dtype=torch.long)
+    return torch.from_numpy(ids)
+
+
+def sequences_to_tensor(
+    sequences: Sequence[str], tokenizer: "Tokenizer", max_len: int
+) -> torch.LongTensor:
+    """Convert sequences to a ``(N, L)`` tensor padded to the longest one.
+
+    Equivalent to ``pad_collate`` over :func:`sequence_to_tensor`, but the
+    whole batch is filled with a single lookup-table gather.
+    """
+    if not sequences:
+        return torch.empty(0, dtype=torch.long)
+    width = max(len(s) for s in sequences)
+    if width > max_len:
+        raise SequenceLengthError(width, max_len)
+    # Joined codes are gathered once and scattered into a padded matrix.
+    try:
+        ids = _lookup("".join(sequences), tokenizer)
+    except InvalidSequenceError:
+        for seq in sequences:  # report the offending sequence itself
+            _lookup(seq, tokenizer)
+        raise
+    lengths = np.fromiter((len(s) for s in sequences), dtype=np.int64, count=len(sequences))
+    out = np.full((len(sequences), width), tokenizer.pad_idx, dtype=np.int64)
+    out[np.arange(width) < lengths[:, None]] = ids
+    return torch.from_numpy(out)
 
 
 def tensor_to_sequence(tensor: torch.Tensor, tokenizer: "Tokenizer") -> str: